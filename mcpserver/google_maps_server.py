@@ -1,9 +1,10 @@
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 import os
+import asyncio
 
-from google.maps.routing_v2 import RoutesClient
-from google.maps.routing_v2.types import ComputeRoutesRequest, Waypoint, RouteModifiers
+from google.maps.routing_v2 import RoutesAsyncClient
+from google.maps.routing_v2.types import ComputeRoutesRequest, Waypoint, RouteModifiers, RouteTravelMode
 
 import urllib.parse
 
@@ -12,16 +13,38 @@ from typing import List
 load_dotenv()
 
 mcp = FastMCP("Google Maps MCP Server")
-client = RoutesClient()
+
+_FIELD_MASK = "routes.duration,routes.distanceMeters"
+_FIELD_MASK_WITH_WAYPOINTS = _FIELD_MASK + ",routes.optimizedIntermediateWaypointIndex"
+
+_TRAVEL_MODES = {
+    name: RouteTravelMode[name]
+    for name in ("DRIVE", "BICYCLE", "WALK", "TWO_WHEELER", "TRANSIT")
+}
+_TRAVEL_MODES_TEXT = ", ".join(f"'{name}'" for name in _TRAVEL_MODES)
+
+# Bounds the number of in-flight Routes API calls across concurrent sessions.
+_routes_semaphore = asyncio.Semaphore(32)
+_ROUTES_TIMEOUT_SECONDS = 10.0
+_client = None
+
+
+def _routes_client():
+    """Returns the shared async Routes client, created lazily inside the server's event loop."""
+    global _client
+    if _client is None:
+        _client = RoutesAsyncClient()
+    return _client
+
 
 @mcp.tool
-def get_directions(from_address: str, 
-                   to_address: str, 
-                   avoid_highways: bool = False, 
-                   avoid_tolls: bool = False, 
-                   avoid_ferries: bool = False, 
-                   landmarks_to_visit: List[str] = [], 
-                   travel_mode: str = "DRIVE"):
+async def get_directions(from_address: str, 
+                         to_address: str, 
+                         avoid_highways: bool = False, 
+                         avoid_tolls: bool = False, 
+                         avoid_ferries: bool = False, 
+                         landmarks_to_visit: List[str] = [], 
+                         travel_mode: str = "DRIVE"):
     """Gets optimized directions for a trip, including duration and distance.
 
     This tool can calculate a route between a start and end address,
@@ -44,7 +67,10 @@ def get_directions(from_address: str,
         'duration_in_hours', and 'distance_meters', or an error message string if a route cannot be found.
     """
     
-    field_mask = "routes.duration,routes.distanceMeters,routes.optimized_intermediate_waypoint_index,routes.description"
+    # Canonical upper-case names skip the .upper() call.
+    travel_mode_enum = _TRAVEL_MODES.get(travel_mode) or _TRAVEL_MODES.get(travel_mode.upper())
+    if travel_mode_enum is None:
+        return f"Invalid travel mode: {travel_mode}. Use one of {_TRAVEL_MODES_TEXT}."
 
     intermediates = [Waypoint(address=landmark) for landmark in landmarks_to_visit]
 
@@ -60,12 +86,14 @@ def get_directions(from_address: str,
         intermediates=intermediates,
         optimize_waypoint_order=True,
         route_modifiers=modifiers,
-        travel_mode=travel_mode,
+        travel_mode=travel_mode_enum,
     )
 
-    response = client.compute_routes(
-        request=compute_routes_request,
-        metadata=[('x-goog-fieldmask', field_mask)]
+    async with _routes_semaphore:
+        response = await _routes_client().compute_routes(
+            request=compute_routes_request,
+            metadata=[('x-goog-fieldmask', _FIELD_MASK_WITH_WAYPOINTS if intermediates else _FIELD_MASK)],
+            timeout=_ROUTES_TIMEOUT_SECONDS,
         )
     if not response.routes:
         return "Addresses may not have been valid. Can you make them more specific?"
@@ -94,18 +122,17 @@ def get_map_url(from_address: str, to_address: str, waypoints: List[str] = [], t
     Returns:
         A string containing the Google Maps URL for the specified directions.
     """
-    encoded_origin = urllib.parse.quote(from_address)
-    encoded_destination = urllib.parse.quote(to_address)
-    encoded_waypoints = urllib.parse.quote("|".join(waypoints))
-
-    url = (f"https://www.google.com/maps/dir/?api=1"
-           f"&origin={encoded_origin}"
-           f"&destination={encoded_destination}"
-           f"&waypoints={encoded_waypoints}"
-           f"&travelmode={travel_mode.lower()}")
-
-    print(url)
-    return url
+    params = [
+        ("api", "1"),
+        ("origin", from_address),
+        ("destination", to_address),
+        ("travelmode", travel_mode.lower()),
+    ]
+    # Leave out the waypoints parameter entirely when there are none.
+    if waypoints:
+        params.append(("waypoints", "|".join(waypoints)))
+
+    return "https://www.google.com/maps/dir/?" + urllib.parse.urlencode(params)
 
 
 if __name__ == "__main__":
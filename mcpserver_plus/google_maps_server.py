@@ -1,9 +1,18 @@
 from fastmcp import FastMCP
 from dotenv import load_dotenv
-from typing import List
+from collections import OrderedDict
+import asyncio
+import copy
+import hashlib
 import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
 from typing import List
-from google.maps.routing_v2 import RoutesClient
+from google.maps.routing_v2 import RoutesAsyncClient
 from google.maps.routing_v2.types import (
     ComputeRoutesRequest,
     RouteModifiers,
@@ -14,16 +23,201 @@ from google.maps.routing_v2.types import (
 load_dotenv()
 
 mcp = FastMCP("Google Maps MCP Server")
-client = RoutesClient()
+logger = logging.getLogger(__name__)
+
+# Only request the fields the result is built from. The waypoint index is
+# only meaningful when there are intermediates to optimize.
+_FIELD_MASK = (
+    "routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline,"
+    "routes.legs.startLocation.latLng,"
+    "routes.legs.endLocation.latLng"
+)
+_FIELD_MASK_METADATA = [('x-goog-fieldmask', _FIELD_MASK)]
+_FIELD_MASK_WITH_WAYPOINTS_METADATA = [
+    ('x-goog-fieldmask', _FIELD_MASK + ",routes.optimizedIntermediateWaypointIndex")
+]
+
+_TRAVEL_MODES = {
+    name: RouteTravelMode[name]
+    for name in ("DRIVE", "BICYCLE", "WALK", "TWO_WHEELER", "TRANSIT")
+}
+_TRAVEL_MODES_TEXT = ", ".join(f"'{name}'" for name in _TRAVEL_MODES)
+
+
+@lru_cache(maxsize=4096)
+def _waypoint(address):
+    return Waypoint(address=address)
+
+
+def _dedupe_landmarks(landmarks):
+    """Drops repeated landmarks (ignoring case and surrounding whitespace), keeping first occurrences in order.
+
+    Returns the deduplicated list and the list of landmarks that were dropped.
+    """
+    seen = {}
+    dropped = []
+    for landmark in landmarks:
+        normalized = landmark.strip().casefold()
+        if normalized in seen:
+            dropped.append(landmark)
+        else:
+            seen[normalized] = landmark
+    if dropped:
+        logger.info("Removed %d duplicate landmark(s): %s", len(dropped), dropped)
+    return list(seen.values()), dropped
+
+
+# Bounds the number of in-flight Routes API calls across concurrent sessions.
+_routes_semaphore = asyncio.Semaphore(32)
+_ROUTES_TIMEOUT_SECONDS = 10.0
+_client = None
+
+
+def _routes_client():
+    """Returns the shared async Routes client, created lazily inside the server's event loop."""
+    global _client
+    if _client is None:
+        _client = RoutesAsyncClient()
+    return _client
+
+# In-process LRU cache of successful get_directions results, keyed on the
+# normalized request arguments. The agent frequently re-asks for the same
+# route while iterating on a plan, so this saves a Routes API call each time.
+# Entries are (timestamp, result) and expire after _ROUTE_CACHE_TTL_SECONDS,
+# in memory and on disk alike.
+# Only touched from the event loop, so it needs no lock.
+_DIRECTIONS_CACHE_SIZE = 512
+_ROUTE_CACHE_TTL_SECONDS = 86400
+_directions_cache = OrderedDict()
+
+
+def _directions_cache_key(from_address, to_address, avoid_highways, avoid_tolls,
+                          avoid_ferries, landmarks_to_visit, travel_mode):
+    """Builds a hashable cache key. Landmark order is preserved since it matters for routing.
+
+    travel_mode is expected to be normalized already, as validated by _get_directions_impl.
+    """
+    return (
+        from_address.strip().lower(),
+        to_address.strip().lower(),
+        avoid_highways,
+        avoid_tolls,
+        avoid_ferries,
+        tuple(landmark.strip().lower() for landmark in landmarks_to_visit),
+        travel_mode,
+    )
+
+
+# Persistent SQLite cache behind the in-process one, so routes survive
+# server restarts. Geocoded waypoints are stored under a "geo:" prefix.
+# Expired rows are purged on write and the table is capped at
+# _ROUTE_CACHE_MAX_ROWS, dropping the oldest rows first.
+_ROUTE_CACHE_PATH = os.environ.get("ROUTE_CACHE_PATH", ".route_cache.sqlite")
+_ROUTE_CACHE_MAX_ROWS = 10000
+_route_db_conn = None
+# SQLite calls run in worker threads via asyncio.to_thread, so the shared
+# connection is still serialized with a lock.
+_route_db_lock = threading.Lock()
+
+
+def _route_db():
+    """Returns the cache database connection, opening it on first use. Call with _route_db_lock held."""
+    global _route_db_conn
+    if _route_db_conn is None:
+        _route_db_conn = sqlite3.connect(_ROUTE_CACHE_PATH, check_same_thread=False)
+        _route_db_conn.execute(
+            "CREATE TABLE IF NOT EXISTS route_cache (key TEXT PRIMARY KEY, payload TEXT, ts INTEGER)"
+        )
+        _route_db_conn.execute("CREATE INDEX IF NOT EXISTS route_cache_ts ON route_cache (ts)")
+        _route_db_conn.commit()
+    return _route_db_conn
+
+
+def _route_db_key(cache_key):
+    return hashlib.blake2b(json.dumps(cache_key, sort_keys=True).encode()).hexdigest()
+
+
+def _route_db_get(key):
+    with _route_db_lock:
+        row = _route_db().execute(
+            "SELECT ts, payload FROM route_cache WHERE key = ? AND ts > ?",
+            (key, int(time.time()) - _ROUTE_CACHE_TTL_SECONDS),
+        ).fetchone()
+    return (row[0], json.loads(row[1])) if row else None
+
+
+def _route_db_put(entries):
+    now = int(time.time())
+    with _route_db_lock:
+        db = _route_db()
+        db.executemany(
+            "INSERT OR REPLACE INTO route_cache (key, payload, ts) VALUES (?, ?, ?)",
+            [(key, json.dumps(payload), now) for key, payload in entries],
+        )
+        db.execute("DELETE FROM route_cache WHERE ts <= ?", (now - _ROUTE_CACHE_TTL_SECONDS,))
+        db.execute(
+            "DELETE FROM route_cache WHERE key NOT IN "
+            "(SELECT key FROM route_cache ORDER BY ts DESC LIMIT ?)",
+            (_ROUTE_CACHE_MAX_ROWS,),
+        )
+        db.commit()
+
+
+async def _directions_cache_get(key):
+    """Returns a copy of the cached result for key, or None if absent or expired."""
+    expiry = int(time.time()) - _ROUTE_CACHE_TTL_SECONDS
+    entry = _directions_cache.get(key)
+    if entry is not None:
+        if entry[0] > expiry:
+            _directions_cache.move_to_end(key)
+            return copy.deepcopy(entry[1])
+        del _directions_cache[key]
+
+    # The persistent cache is best-effort; a broken database is just a miss.
+    try:
+        entry = await asyncio.to_thread(_route_db_get, _route_db_key(key))
+    except sqlite3.Error as e:
+        logger.warning("Route cache read failed: %s", e)
+        entry = None
+    if entry is None:
+        return None
+    ts, result = entry
+    _directions_memory_put(key, result, ts)
+    return copy.deepcopy(result)
+
+
+def _directions_memory_put(key, result, ts):
+    _directions_cache[key] = (ts, result)
+    _directions_cache.move_to_end(key)
+    while len(_directions_cache) > _DIRECTIONS_CACHE_SIZE:
+        _directions_cache.popitem(last=False)
+
+
+async def _directions_cache_put(key, result):
+    # Cache a private copy so callers can't mutate the stored result.
+    result = copy.deepcopy(result)
+    _directions_memory_put(key, result, int(time.time()))
+
+    entries = [(_route_db_key(key), result)]
+    for waypoint in result["ordered_waypoints"]:
+        entries.append((
+            "geo:" + waypoint["address"].strip().lower(),
+            {"address": waypoint["address"], "lat": waypoint["lat"], "lng": waypoint["lng"]},
+        ))
+    try:
+        await asyncio.to_thread(_route_db_put, entries)
+    except sqlite3.Error as e:
+        logger.warning("Route cache write failed: %s", e)
+
 
 @mcp.tool
-def get_directions(from_address: str, 
-                   to_address: str, 
-                   avoid_highways: bool = False, 
-                   avoid_tolls: bool = False, 
-                   avoid_ferries: bool = False, 
-                   landmarks_to_visit: List[str] = [], 
-                   travel_mode: str = "DRIVE"):
+async def get_directions(from_address: str, 
+                         to_address: str, 
+                         avoid_highways: bool = False, 
+                         avoid_tolls: bool = False, 
+                         avoid_ferries: bool = False, 
+                         landmarks_to_visit: List[str] = [], 
+                         travel_mode: str = "DRIVE"):
     """Gets optimized directions for a trip, including duration, distance,
     and map-plotting data (polyline and ordered waypoints).
 
@@ -38,7 +232,7 @@ def get_directions(from_address: str,
         avoid_tolls: If true, avoids toll roads. Defaults to False.
         avoid_ferries: If true, avoids ferries. Defaults to False.
         landmarks_to_visit: A list of landmark addresses to visit. The tool optimizes their order.
-        travel_mode: "DRIVE", "BICYCLE", "WALK", "TWO_WHEELER". Defaults to "DRIVE".
+        travel_mode: "DRIVE", "BICYCLE", "WALK", "TWO_WHEELER", "TRANSIT". Defaults to "DRIVE".
 
     Returns:
         A pyton dict containing route information. Includes:
@@ -51,26 +245,49 @@ def get_directions(from_address: str,
           - 'lat': Latitude.
           - 'lng': Longitude.
           - 'details': A placeholder for details.
+        - 'dropped_duplicate_landmarks': Landmarks that were left out because they
+          repeat an earlier landmark (ignoring case and whitespace).
+        On failure, a dict with a single 'error' message.
     """
-    
-    field_mask = (
-        "routes.duration,routes.distanceMeters,routes.description,routes.polyline.encodedPolyline,"
-        "routes.optimizedIntermediateWaypointIndex,"
-        "routes.legs.startLocation.latLng,"
-        "routes.legs.endLocation.latLng"
-    )
+    # Normalize once so the cache key and the travel mode validation agree.
+    travel_mode = travel_mode.strip().upper()
 
-    intermediates_wps = [Waypoint(address=landmark) for landmark in landmarks_to_visit]
+    # Each repeated waypoint is billed and enlarges the optimization problem.
+    # The dropped list is specific to this caller's input, so it is reported
+    # alongside the result but never cached.
+    landmarks_to_visit, dropped_landmarks = _dedupe_landmarks(landmarks_to_visit)
+
+    cache_key = _directions_cache_key(from_address, to_address, avoid_highways, avoid_tolls,
+                                      avoid_ferries, landmarks_to_visit, travel_mode)
+    result = await _directions_cache_get(cache_key)
+    if result is None:
+        result = await _get_directions_impl(from_address, to_address, avoid_highways, avoid_tolls,
+                                            avoid_ferries, landmarks_to_visit, travel_mode)
+        if "error" in result:
+            return result
+        # Only successful lookups are cached.
+        await _directions_cache_put(cache_key, result)
+
+    result["dropped_duplicate_landmarks"] = dropped_landmarks
+    return result
 
-    # Handle travel mode string
-    try:
-        travel_mode_enum = RouteTravelMode[travel_mode.upper()]
-    except KeyError:
-        return json.dumps({"error": f"Invalid travel mode: {travel_mode}. Use 'DRIVE', 'BICYCLE', 'WALK', or 'TWO_WHEELER'."})
+
+async def _get_directions_impl(from_address, to_address, avoid_highways, avoid_tolls,
+                               avoid_ferries, landmarks_to_visit, travel_mode):
+    """Calls the Routes API and assembles the get_directions result.
+
+    landmarks_to_visit is expected to be deduplicated already.
+    """
+    intermediates_wps = [_waypoint(landmark) for landmark in landmarks_to_visit]
+
+    # travel_mode arrives stripped and upper-cased from get_directions.
+    travel_mode_enum = _TRAVEL_MODES.get(travel_mode)
+    if travel_mode_enum is None:
+        return {"error": f"Invalid travel mode: {travel_mode}. Use one of {_TRAVEL_MODES_TEXT}."}
 
     compute_routes_request = ComputeRoutesRequest(
-        origin=Waypoint(address=from_address),
-        destination=Waypoint(address=to_address),
+        origin=_waypoint(from_address),
+        destination=_waypoint(to_address),
         intermediates=intermediates_wps,
         # Only optimize if there are waypoints to optimize
         optimize_waypoint_order=True if intermediates_wps else False,
@@ -83,64 +300,58 @@ def get_directions(from_address: str,
     )
 
     try:
-        response = client.compute_routes(
-            request=compute_routes_request,
-            metadata=[('x-goog-fieldmask', field_mask)]
-        )
+        async with _routes_semaphore:
+            response = await _routes_client().compute_routes(
+                request=compute_routes_request,
+                metadata=_FIELD_MASK_WITH_WAYPOINTS_METADATA if intermediates_wps else _FIELD_MASK_METADATA,
+                timeout=_ROUTES_TIMEOUT_SECONDS,
+            )
     except Exception as e:
-        return json.dumps({"error": f"Error computing routes: {str(e)}"})
+        return {"error": f"Error computing routes: {str(e)}"}
 
     if not response.routes:
-        return json.dumps({"error": "No route found. Addresses may not have been valid. Please be more specific."})
+        return {"error": "No route found. Addresses may not have been valid. Please be more specific."}
 
-    print(response)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Routes response: %s", response)
 
     route = response.routes[0]
     
-    ordered_waypoints = []
+    # Read each leg's coordinates off the proto once; attribute access on
+    # proto messages is comparatively slow.
+    legs = route.legs
+    start = legs[0].start_location.lat_lng
+    ends = [(leg.end_location.lat_lng.latitude, leg.end_location.lat_lng.longitude) for leg in legs]
 
     # 1. Add Origin
     # The origin of the *route* is the startLocation of the *first leg*.
-    ordered_waypoints.append({
+    ordered_waypoints = [{
         "address": from_address,
-        "lat": route.legs[0].start_location.lat_lng.latitude,
-        "lng": route.legs[0].start_location.lat_lng.longitude,
+        "lat": start.latitude,
+        "lng": start.longitude,
         "details": "Starting Point"
-    })
+    }]
 
-    # 2. Add Optimized Intermediates
-    if route.optimized_intermediate_waypoint_index:
-        # Iterate over the optimized index list to get the correct *original* address
-        for i, original_index in enumerate(route.optimized_intermediate_waypoint_index):
-            original_address = landmarks_to_visit[original_index]
-            
-            # The location data is the *end* of the corresponding leg.
-            # Stop 1 (i=0) is the end of leg 0.
-            leg_for_this_stop = route.legs[i]
-            
-            ordered_waypoints.append({
-                "address": original_address,
-                "lat": leg_for_this_stop.end_location.lat_lng.latitude,
-                "lng": leg_for_this_stop.end_location.lat_lng.longitude,
-                "details": f"Stop {i+1}: {original_address}"
-            })
-    elif landmarks_to_visit:
-        # No optimization, but intermediates exist. Add them in the order given.
-        for i, address in enumerate(landmarks_to_visit):
-            leg_for_this_stop = route.legs[i]
-            ordered_waypoints.append({
-                "address": address,
-                "lat": leg_for_this_stop.end_location.lat_lng.latitude,
-                "lng": leg_for_this_stop.end_location.lat_lng.longitude,
-                "details": f"Stop {i+1}: {address}"
-            })
+    # 2. Add Intermediates, in optimized order if the API returned one.
+    # The location of stop i is the *end* of leg i.
+    stop_order = route.optimized_intermediate_waypoint_index or range(len(landmarks_to_visit))
+    for i, original_index in enumerate(stop_order):
+        address = landmarks_to_visit[original_index]
+        lat, lng = ends[i]
+        ordered_waypoints.append({
+            "address": address,
+            "lat": lat,
+            "lng": lng,
+            "details": f"Stop {i+1}: {address}"
+        })
 
     # 3. Add Destination
     # The destination of the *route* is the endLocation of the *last leg*.
+    lat, lng = ends[-1]
     ordered_waypoints.append({
         "address": to_address,
-        "lat": route.legs[-1].end_location.lat_lng.latitude,
-        "lng": route.legs[-1].end_location.lat_lng.longitude,
+        "lat": lat,
+        "lng": lng,
         "details": "Destination"
     })
 
@@ -155,14 +366,13 @@ def get_directions(from_address: str,
     distance_text = f"{distance_km} km"
 
     result = {
-        "description": route.description,
         "duration_text": duration_text,
         "distance_text": distance_text,
         "encoded_polyline": route.polyline.encoded_polyline, 
         "ordered_waypoints": ordered_waypoints,
     }
     
-    # Return as a JSON string to match your docstring
+    # Returned as a dict; FastMCP serializes it once for the response.
     return result
 
 
@@ -173,6 +383,10 @@ def get_route(origin: str, destination: str, waypoints_list: List):
 
 
 if __name__ == "__main__":
+    # Only this module follows FASTMCP_LOG_LEVEL; other libraries stay at WARNING.
+    log_level = logging.getLevelName(os.environ.get("FASTMCP_LOG_LEVEL", "INFO").upper())
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(log_level if isinstance(log_level, int) else logging.INFO)
     mcp.run(
         transport="http",
         host="127.0.0.1",